@@ -0,0 +1,20 @@
+# One-off migration: copy user, artist and service display names onto
+# bookings written before booking snapshots existed. Safe to re-run; it only
+# touches bookings that are still missing a snapshot field.
+#
+#   cd backend && python backfill_booking_snapshots.py
+import asyncio
+
+from server import backfill_booking_snapshots, storage
+
+
+async def main():
+    try:
+        count = await backfill_booking_snapshots()
+        print(f"Backfilled {count} bookings")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
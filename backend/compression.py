@@ -0,0 +1,108 @@
+from typing import List, Optional, Tuple
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Compresses complete JSON responses when the client accepts br or gzip.
+# Only single-message bodies are touched: streamed responses such as the
+# booking SSE feed pass through untouched so events are not held back in a
+# compressor buffer.
+
+COMPRESSIBLE_TYPES = ("application/json",)
+
+
+def parse_accept_encoding(header: str) -> List[Tuple[str, float]]:
+    encodings = []
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings.append((token.strip().lower(), quality))
+    return encodings
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = {token: quality for token, quality in parse_accept_encoding(header)}
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            body = message.get("body", b"")
+            response_headers = [(k.lower(), v) for k, v in start_message["headers"]]
+            content_type = dict(response_headers).get(b"content-type", b"").decode("latin-1")
+            already_encoded = any(k == b"content-encoding" for k, _ in response_headers)
+
+            if (
+                message.get("more_body", False)
+                or already_encoded
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+            response_headers = [(k, v) for k, v in response_headers if k != b"content-length"]
+            response_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            start_message["headers"] = response_headers
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
@@ -0,0 +1,66 @@
+from typing import Dict, Optional, Set
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-process fan-out for booking events. Each subscriber gets a bounded
+# queue of already-encoded SSE frames; publishing never awaits, so one slow
+# dashboard cannot hold up a request that creates or updates a booking.
+# A subscriber whose queue is full is dropped: its queue is cleared and a
+# None sentinel tells its stream to close. Events published while a client
+# is disconnected are not replayed; DashboardPage re-fetches its bookings
+# whenever the stream reconnects.
+
+class Subscriber:
+    def __init__(self, user_id: str, buffer_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+
+class BookingEventHub:
+    def __init__(self, buffer_size: int = 64):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, user_id: str) -> Subscriber:
+        subscriber = Subscriber(user_id, self.buffer_size)
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subs = self._subscribers.get(subscriber.user_id)
+        if subs is None:
+            return
+        subs.discard(subscriber)
+        if not subs:
+            del self._subscribers[subscriber.user_id]
+
+    def publish(self, user_id: str, event: str, data: dict) -> None:
+        subs = self._subscribers.get(user_id)
+        if not subs:
+            return
+        frame = format_event(event, data)
+        for subscriber in list(subs):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping slow booking stream subscriber for user {user_id}")
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+
+def format_event(event: Optional[str], data: dict) -> str:
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
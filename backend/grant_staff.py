@@ -0,0 +1,28 @@
+# Grant or revoke staff access. Staff can edit the catalog and manage every
+# booking, so this is deliberately not reachable through the API.
+#
+#   cd backend && python grant_staff.py owner@example.com
+#   cd backend && python grant_staff.py owner@example.com --revoke
+import asyncio
+import sys
+
+from server import storage
+
+
+async def main(email: str, role: str):
+    try:
+        changed = await storage.users.update_many({"email": email.lower()}, {"role": role})
+        user = await storage.users.find_one({"email": email.lower()}, ["user_id"])
+        if not user:
+            print(f"No user registered as {email}")
+            sys.exit(1)
+        print(f"{email} is now {role}" if changed else f"{email} was already {role}")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ["--revoke"]):
+        print("usage: python grant_staff.py EMAIL [--revoke]")
+        sys.exit(2)
+    asyncio.run(main(sys.argv[1], "customer" if sys.argv[2:] else "staff"))
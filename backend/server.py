@@ -1,27 +1,29 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, create_model
+from typing import List, Literal, Optional
 import uuid
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 import bcrypt
 import jwt
 import asyncio
 import resend
+from storage import DuplicateKeyError, create_storage
+from events import BookingEventHub
+from compression import CompressionMiddleware
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage backend ("mongo" or "memory", see STORAGE_BACKEND)
+storage = create_storage()
 
 # Resend configuration
 RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
@@ -33,10 +35,21 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'neax-tattoos-secret-key-2024')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
+# Booking stream configuration
+BOOKING_STREAM_BUFFER_SIZE = 64
+BOOKING_STREAM_HEARTBEAT_SECONDS = 15
+BOOKING_STREAM_RETRY_MS = 3000
+# Stream tokens travel in the URL and end up in access logs, so they are
+# scoped to the stream and expire quickly.
+BOOKING_STREAM_TOKEN_SCOPE = "booking_stream"
+BOOKING_STREAM_TOKEN_SECONDS = 60
+
 # Create the main app
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+booking_events = BookingEventHub(buffer_size=BOOKING_STREAM_BUFFER_SIZE)
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +61,8 @@ class User(BaseModel):
     email: EmailStr
     name: str
     phone: Optional[str] = None
+    # Only ever set out of band, with grant_staff.py
+    role: Literal["customer", "staff"] = "customer"
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UserRegister(BaseModel):
@@ -60,6 +75,10 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class UserUpdate(BaseModel):
+    name: Optional[str] = None
+    phone: Optional[str] = None
+
 class Artist(BaseModel):
     model_config = ConfigDict(extra="ignore")
     artist_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -70,6 +89,14 @@ class Artist(BaseModel):
     instagram: Optional[str] = None
     years_experience: int
 
+class ArtistUpdate(BaseModel):
+    name: Optional[str] = None
+    bio: Optional[str] = None
+    specialty: Optional[str] = None
+    image_url: Optional[str] = None
+    instagram: Optional[str] = None
+    years_experience: Optional[int] = None
+
 class Service(BaseModel):
     model_config = ConfigDict(extra="ignore")
     service_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -79,12 +106,23 @@ class Service(BaseModel):
     price_start: int
     icon: str
 
+class ServiceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    price_start: Optional[int] = None
+    icon: Optional[str] = None
+
 class Booking(BaseModel):
     model_config = ConfigDict(extra="ignore")
     booking_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     artist_id: str
     service_id: str
+    user_name: str
+    user_email: str
+    artist_name: str
+    service_name: str
     appointment_date: str
     appointment_time: str
     notes: Optional[str] = None
@@ -110,6 +148,9 @@ class BookingWithDetails(BaseModel):
     status: str
     created_at: datetime
 
+class BookingStatusUpdate(BaseModel):
+    status: Literal["pending", "confirmed", "completed", "cancelled"]
+
 class EmailRequest(BaseModel):
     recipient_email: EmailStr
     subject: str
@@ -131,6 +172,14 @@ def create_token(user_id: str, email: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def create_stream_token(user_id: str) -> str:
+    payload = {
+        'user_id': user_id,
+        'scope': BOOKING_STREAM_TOKEN_SCOPE,
+        'exp': datetime.now(timezone.utc) + timedelta(seconds=BOOKING_STREAM_TOKEN_SECONDS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
 def decode_token(token: str) -> dict:
     try:
         return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
@@ -139,26 +188,182 @@ def decode_token(token: str) -> dict:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
+def parse_fields(fields: Optional[str], model: type) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested or None
+
+@lru_cache(maxsize=256)
+def trimmed_model(model: type, fields: tuple) -> type:
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
+
+def sparse_response(model: type, fields: List[str], docs: List[dict]) -> JSONResponse:
+    trimmed = trimmed_model(model, tuple(fields))
+    return JSONResponse([trimmed(**doc).model_dump(mode="json") for doc in docs])
+
+async def get_user_from_token(token: str, scope: Optional[str] = None) -> User:
     payload = decode_token(token)
-    user = await db.users.find_one({"user_id": payload['user_id']}, {"_id": 0})
+    if payload.get('scope') != scope:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user = await storage.users.get(payload['user_id'])
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return User(**user)
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await get_user_from_token(credentials.credentials)
+
+def is_staff(user: User) -> bool:
+    return user.role == "staff"
+
+async def require_staff(current_user: User = Depends(get_current_user)):
+    if not is_staff(current_user):
+        raise HTTPException(status_code=403, detail="Staff only")
+    return current_user
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    # EventSource cannot set headers, so browsers pass a stream token from
+    # POST /bookings/stream/token as ?token=. Other clients can use the header.
+    if credentials:
+        return await get_user_from_token(credentials.credentials)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await get_user_from_token(token, scope=BOOKING_STREAM_TOKEN_SCOPE)
+
+# ============ BOOKING SNAPSHOTS ============
+# Bookings store a copy of the user, artist and service display fields so the
+# booking lists are single-collection reads. create_booking writes the
+# snapshot from the documents it already validated. Anything that renames an
+# artist or service (or changes a user's name/email) must call the matching
+# refresh_* helper right after its own write so existing bookings follow;
+# update_me, update_artist and update_service do. A rename can still land
+# between create_booking reading the names and inserting the booking, after
+# the refresh has run, so create_booking re-reads the names once the booking
+# is stored and fixes that one booking (recheck_booking_snapshot).
+# backfill_booking_snapshots
+# fills bookings written before snapshots existed. It is a one-off migration,
+# run with backfill_booking_snapshots.py, not on startup.
+
+BOOKING_SNAPSHOT_FIELDS = ("user_name", "user_email", "artist_name", "service_name")
+
+BOOKING_DETAILS_FIELDS = list(BookingWithDetails.model_fields)
+
+def with_snapshot_fallbacks(booking: dict) -> dict:
+    # Bookings not yet backfilled, or written by an older worker mid-rollout,
+    # read as 'Unknown' rather than failing validation
+    missing = {field: 'Unknown' for field in BOOKING_SNAPSHOT_FIELDS if not booking.get(field)}
+    return {**booking, **missing} if missing else booking
+
+def booking_with_details(booking: dict) -> BookingWithDetails:
+    booking = with_snapshot_fallbacks(booking)
+    created_at = booking['created_at']
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    
+    return BookingWithDetails(
+        booking_id=booking['booking_id'],
+        user_name=booking['user_name'],
+        user_email=booking['user_email'],
+        artist_name=booking['artist_name'],
+        service_name=booking['service_name'],
+        appointment_date=booking['appointment_date'],
+        appointment_time=booking['appointment_time'],
+        notes=booking.get('notes'),
+        status=booking['status'],
+        created_at=created_at
+    )
+
+async def refresh_user_snapshots(user_id: str, name: str, email: str) -> int:
+    return await storage.bookings.update_many({"user_id": user_id}, {"user_name": name, "user_email": email})
+
+async def refresh_artist_snapshots(artist_id: str, name: str) -> int:
+    return await storage.bookings.update_many({"artist_id": artist_id}, {"artist_name": name})
+
+async def refresh_service_snapshots(service_id: str, name: str) -> int:
+    return await storage.bookings.update_many({"service_id": service_id}, {"service_name": name})
+
+async def recheck_booking_snapshot(doc: dict) -> dict:
+    user = await storage.users.get(doc['user_id'], ["name", "email"])
+    artist = await storage.artists.get(doc['artist_id'], ["name"])
+    service = await storage.services.get(doc['service_id'], ["name"])
+    
+    current = {}
+    if user:
+        current.update(user_name=user['name'], user_email=user['email'])
+    if artist:
+        current['artist_name'] = artist['name']
+    if service:
+        current['service_name'] = service['name']
+    
+    stale = {field: value for field, value in current.items() if doc.get(field) != value}
+    if stale:
+        await storage.bookings.update_many({"booking_id": doc['booking_id']}, stale)
+        doc.update(stale)
+    return stale
+
+async def backfill_booking_snapshots() -> int:
+    missing = {"$or": [{field: {"$exists": False}} for field in BOOKING_SNAPSHOT_FIELDS]}
+    bookings = await storage.bookings.find(missing, ["booking_id", "user_id", "artist_id", "service_id"])
+    if not bookings:
+        return 0
+    
+    user_ids = list({b['user_id'] for b in bookings})
+    artist_ids = list({b['artist_id'] for b in bookings})
+    service_ids = list({b['service_id'] for b in bookings})
+    users = {
+        u['user_id']: u
+        for u in await storage.users.find({"user_id": {"$in": user_ids}}, ["user_id", "name", "email"])
+    }
+    artists = {
+        a['artist_id']: a
+        for a in await storage.artists.find({"artist_id": {"$in": artist_ids}}, ["artist_id", "name"])
+    }
+    services = {
+        s['service_id']: s
+        for s in await storage.services.find({"service_id": {"$in": service_ids}}, ["service_id", "name"])
+    }
+    
+    updates = []
+    for booking in bookings:
+        user = users.get(booking['user_id'], {})
+        updates.append((
+            {"booking_id": booking['booking_id']},
+            {
+                "user_name": user.get('name', 'Unknown'),
+                "user_email": user.get('email', 'Unknown'),
+                "artist_name": artists.get(booking['artist_id'], {}).get('name', 'Unknown'),
+                "service_name": services.get(booking['service_id'], {}).get('name', 'Unknown'),
+            }
+        ))
+    await storage.bookings.bulk_update(updates)
+    
+    logger.info(f"Backfilled booking snapshots for {len(bookings)} bookings")
+    return len(bookings)
+
 # ============ AUTH ROUTES ============
 
 @api_router.post("/auth/register")
 async def register(user_data: UserRegister):
     # Check if user exists
-    existing = await db.users.find_one({"email": user_data.email}, {"_id": 0})
+    # Emails are stored lowercased so the unique index covers case variants
+    email = user_data.email.lower()
+    existing = await storage.users.find_one({"email": email})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
     user = User(
-        email=user_data.email,
+        email=email,
         name=user_data.name,
         phone=user_data.phone
     )
@@ -167,7 +372,11 @@ async def register(user_data: UserRegister):
     doc['created_at'] = doc['created_at'].isoformat()
     doc['password_hash'] = hash_password(user_data.password)
     
-    await db.users.insert_one(doc)
+    try:
+        await storage.users.insert(doc)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent register for the same email
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     token = create_token(user.user_id, user.email)
     return {
@@ -178,7 +387,10 @@ async def register(user_data: UserRegister):
 
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
-    user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
+    user_doc = await storage.users.find_one({"email": credentials.email.lower()})
+    if not user_doc:
+        # Accounts registered before emails were lowercased
+        user_doc = await storage.users.find_one({"email": credentials.email})
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -198,11 +410,26 @@ async def login(credentials: UserLogin):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+@api_router.patch("/auth/me", response_model=User)
+async def update_me(update: UserUpdate, current_user: User = Depends(get_current_user)):
+    changes = update.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return current_user
+    
+    await storage.users.update_many({"user_id": current_user.user_id}, changes)
+    user = current_user.model_copy(update=changes)
+    if 'name' in changes:
+        await refresh_user_snapshots(user.user_id, user.name, user.email)
+    return user
+
 # ============ ARTIST ROUTES ============
 
 @api_router.get("/artists", response_model=List[Artist])
-async def get_artists():
-    artists = await db.artists.find({}, {"_id": 0}).to_list(100)
+async def get_artists(fields: Optional[str] = None):
+    selected = parse_fields(fields, Artist)
+    # name, instagram and artist_id are always read for de-duplication
+    projection = list(dict.fromkeys(selected + ["artist_id", "name", "instagram"])) if selected else None
+    artists = await storage.artists.find(fields=projection, limit=100)
     seen = set()
     unique = []
     for artist in artists:
@@ -213,25 +440,58 @@ async def get_artists():
         if key:
             seen.add(key)
         unique.append(artist)
+    if selected:
+        return sparse_response(Artist, selected, unique)
     return unique
 
 @api_router.post("/artists", response_model=Artist)
 async def create_artist(artist: Artist):
     doc = artist.model_dump()
-    await db.artists.insert_one(doc)
+    await storage.artists.insert(doc)
+    return artist
+
+@api_router.patch("/artists/{artist_id}", response_model=Artist)
+async def update_artist(artist_id: str, update: ArtistUpdate, staff: User = Depends(require_staff)):
+    artist = await storage.artists.get(artist_id)
+    if not artist:
+        raise HTTPException(status_code=404, detail="Artist not found")
+    
+    changes = update.model_dump(exclude_unset=True, exclude_none=True)
+    if changes:
+        await storage.artists.update_many({"artist_id": artist_id}, changes)
+        artist.update(changes)
+        if 'name' in changes:
+            await refresh_artist_snapshots(artist_id, changes['name'])
     return artist
 
 # ============ SERVICE ROUTES ============
 
 @api_router.get("/services", response_model=List[Service])
-async def get_services():
-    services = await db.services.find({}, {"_id": 0}).to_list(100)
+async def get_services(fields: Optional[str] = None):
+    selected = parse_fields(fields, Service)
+    services = await storage.services.find(fields=selected, limit=100)
+    if selected:
+        return sparse_response(Service, selected, services)
     return services
 
 @api_router.post("/services", response_model=Service)
 async def create_service(service: Service):
     doc = service.model_dump()
-    await db.services.insert_one(doc)
+    await storage.services.insert(doc)
+    return service
+
+@api_router.patch("/services/{service_id}", response_model=Service)
+async def update_service(service_id: str, update: ServiceUpdate, staff: User = Depends(require_staff)):
+    service = await storage.services.get(service_id)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+    
+    changes = update.model_dump(exclude_unset=True, exclude_none=True)
+    if changes:
+        await storage.services.update_many({"service_id": service_id}, changes)
+        service.update(changes)
+        if 'name' in changes:
+            await refresh_service_snapshots(service_id, changes['name'])
     return service
 
 # ============ BOOKING ROUTES ============
@@ -239,12 +499,12 @@ async def create_service(service: Service):
 @api_router.post("/bookings", response_model=Booking)
 async def create_booking(booking_data: BookingCreate, current_user: User = Depends(get_current_user)):
     # Validate artist exists
-    artist = await db.artists.find_one({"artist_id": booking_data.artist_id}, {"_id": 0})
+    artist = await storage.artists.get(booking_data.artist_id)
     if not artist:
         raise HTTPException(status_code=404, detail="Artist not found")
     
     # Validate service exists
-    service = await db.services.find_one({"service_id": booking_data.service_id}, {"_id": 0})
+    service = await storage.services.get(booking_data.service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
@@ -253,6 +513,10 @@ async def create_booking(booking_data: BookingCreate, current_user: User = Depen
         user_id=current_user.user_id,
         artist_id=booking_data.artist_id,
         service_id=booking_data.service_id,
+        user_name=current_user.name,
+        user_email=current_user.email,
+        artist_name=artist['name'],
+        service_name=service['name'],
         appointment_date=booking_data.appointment_date,
         appointment_time=booking_data.appointment_time,
         notes=booking_data.notes
@@ -261,7 +525,13 @@ async def create_booking(booking_data: BookingCreate, current_user: User = Depen
     doc = booking.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.bookings.insert_one(doc)
+    await storage.bookings.insert(doc)
+    stale = await recheck_booking_snapshot(doc)
+    if stale:
+        booking = booking.model_copy(update=stale)
+    booking_events.publish(
+        booking.user_id, "booking_created", booking_with_details(doc).model_dump(mode="json")
+    )
     
     # Send confirmation email (only if Resend is configured)
     if not RESEND_API_KEY:
@@ -306,72 +576,90 @@ async def create_booking(booking_data: BookingCreate, current_user: User = Depen
     return booking
 
 @api_router.get("/bookings/my", response_model=List[BookingWithDetails])
-async def get_my_bookings(current_user: User = Depends(get_current_user)):
-    bookings = await db.bookings.find({"user_id": current_user.user_id}, {"_id": 0}).to_list(100)
-    
-    result = []
-    for booking in bookings:
-        artist = await db.artists.find_one({"artist_id": booking['artist_id']}, {"_id": 0})
-        service = await db.services.find_one({"service_id": booking['service_id']}, {"_id": 0})
-        
-        if isinstance(booking['created_at'], str):
-            booking['created_at'] = datetime.fromisoformat(booking['created_at'])
-        
-        result.append(BookingWithDetails(
-            booking_id=booking['booking_id'],
-            user_name=current_user.name,
-            user_email=current_user.email,
-            artist_name=artist['name'] if artist else 'Unknown',
-            service_name=service['name'] if service else 'Unknown',
-            appointment_date=booking['appointment_date'],
-            appointment_time=booking['appointment_time'],
-            notes=booking.get('notes'),
-            status=booking['status'],
-            created_at=booking['created_at']
-        ))
-    
-    return result
+async def get_my_bookings(fields: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    selected = parse_fields(fields, BookingWithDetails)
+    bookings = await storage.bookings.find({"user_id": current_user.user_id}, selected or BOOKING_DETAILS_FIELDS, limit=100)
+    if selected:
+        return sparse_response(BookingWithDetails, selected, [with_snapshot_fallbacks(b) for b in bookings])
+    return [booking_with_details(booking) for booking in bookings]
 
 @api_router.get("/bookings", response_model=List[BookingWithDetails])
-async def get_all_bookings():
-    bookings = await db.bookings.find({}, {"_id": 0}).to_list(1000)
+async def get_all_bookings(fields: Optional[str] = None):
+    selected = parse_fields(fields, BookingWithDetails)
+    bookings = await storage.bookings.find(fields=selected or BOOKING_DETAILS_FIELDS, limit=1000)
+    if selected:
+        return sparse_response(BookingWithDetails, selected, [with_snapshot_fallbacks(b) for b in bookings])
+    return [booking_with_details(booking) for booking in bookings]
+
+@api_router.patch("/bookings/{booking_id}/status", response_model=BookingWithDetails)
+async def update_booking_status(
+    booking_id: str,
+    update: BookingStatusUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    booking = await storage.bookings.get(booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
     
-    result = []
-    for booking in bookings:
-        user = await db.users.find_one({"user_id": booking['user_id']}, {"_id": 0})
-        artist = await db.artists.find_one({"artist_id": booking['artist_id']}, {"_id": 0})
-        service = await db.services.find_one({"service_id": booking['service_id']}, {"_id": 0})
-        
-        if isinstance(booking['created_at'], str):
-            booking['created_at'] = datetime.fromisoformat(booking['created_at'])
-        
-        result.append(BookingWithDetails(
-            booking_id=booking['booking_id'],
-            user_name=user['name'] if user else 'Unknown',
-            user_email=user['email'] if user else 'Unknown',
-            artist_name=artist['name'] if artist else 'Unknown',
-            service_name=service['name'] if service else 'Unknown',
-            appointment_date=booking['appointment_date'],
-            appointment_time=booking['appointment_time'],
-            notes=booking.get('notes'),
-            status=booking['status'],
-            created_at=booking['created_at']
-        ))
+    # Staff manage every booking; customers can only cancel their own
+    if not is_staff(current_user):
+        if booking['user_id'] != current_user.user_id:
+            raise HTTPException(status_code=404, detail="Booking not found")
+        if update.status != "cancelled":
+            raise HTTPException(status_code=403, detail="Only staff can set this status")
+    
+    if booking['status'] == update.status:
+        return booking_with_details(booking)
     
-    return result
+    await storage.bookings.update_many({"booking_id": booking_id}, {"status": update.status})
+    booking['status'] = update.status
+    details = booking_with_details(booking)
+    booking_events.publish(booking['user_id'], "booking_status_changed", details.model_dump(mode="json"))
+    return details
+
+@api_router.post("/bookings/stream/token")
+async def create_booking_stream_token(current_user: User = Depends(get_current_user)):
+    return {
+        "token": create_stream_token(current_user.user_id),
+        "expires_in": BOOKING_STREAM_TOKEN_SECONDS
+    }
+
+@api_router.get("/bookings/stream")
+async def stream_bookings(current_user: User = Depends(get_stream_user)):
+    async def event_stream():
+        subscriber = booking_events.subscribe(current_user.user_id)
+        try:
+            yield f"retry: {BOOKING_STREAM_RETRY_MS}\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), BOOKING_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            booking_events.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ============ SEED DATA ROUTE ============
 
 @api_router.post("/seed")
 async def seed_data():
     # Check if data already exists
-    existing_artists = await db.artists.count_documents({})
+    existing_artists = await storage.artists.count()
     if existing_artists > 0:
         return {"message": "Data already seeded"}
     
     # Clear existing data
-    await db.artists.delete_many({})
-    await db.services.delete_many({})
+    await storage.artists.delete_many()
+    await storage.services.delete_many()
     
     # Seed artists
     artists = [
@@ -402,7 +690,7 @@ async def seed_data():
     ]
     
     for artist in artists:
-        await db.artists.insert_one(artist.model_dump())
+        await storage.artists.insert(artist.model_dump())
     
     # Seed services
     services = [
@@ -437,7 +725,7 @@ async def seed_data():
     ]
     
     for service in services:
-        await db.services.insert_one(service.model_dump())
+        await storage.services.insert(service.model_dump())
     
     return {"message": "Data seeded successfully"}
 
@@ -450,6 +738,8 @@ async def root():
 # Include router
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -463,6 +753,10 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+@app.on_event("startup")
+async def prepare_storage():
+    await storage.ensure_indexes()
+
 @app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def shutdown_storage():
+    storage.close()
\ No newline at end of file
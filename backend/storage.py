@@ -0,0 +1,342 @@
+from abc import ABC, abstractmethod
+from itertools import count as counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Filters passed to repositories are a small subset of the Mongo query
+# language so both backends can answer them the same way: field equality,
+# {"$in": [...]}, {"$exists": bool} and a top-level "$or" list of filters.
+# The memory backend raises ValueError for any other operator rather than
+# guessing. Field selections are lists of field names; "_id" is never returned.
+
+class DuplicateKeyError(Exception):
+    pass
+
+
+class Repository(ABC):
+    def __init__(self, key: str, indexes: Sequence[str] = (), unique: Sequence[str] = ()):
+        self.key = key
+        self.indexes = tuple(indexes)
+        self.unique = tuple(unique)
+
+    @abstractmethod
+    async def find_one(self, filter: dict, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find(self, filter: Optional[dict] = None, fields: Optional[Sequence[str]] = None,
+                   limit: Optional[int] = None) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def update_many(self, filter: dict, values: dict) -> int:
+        ...
+
+    @abstractmethod
+    async def bulk_update(self, updates: Sequence[Tuple[dict, dict]]) -> int:
+        ...
+
+    @abstractmethod
+    async def count(self, filter: Optional[dict] = None) -> int:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, filter: Optional[dict] = None) -> int:
+        ...
+
+    async def get(self, key_value: str, fields: Optional[Sequence[str]] = None) -> Optional[dict]:
+        return await self.find_one({self.key: key_value}, fields)
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+
+class Storage:
+    def __init__(self, users: Repository, artists: Repository, services: Repository, bookings: Repository):
+        self.users = users
+        self.artists = artists
+        self.services = services
+        self.bookings = bookings
+
+    async def ensure_indexes(self) -> None:
+        # One collection failing (e.g. existing duplicate emails blocking the
+        # unique index) must not leave the others unindexed
+        for name in ("users", "artists", "services", "bookings"):
+            try:
+                await getattr(self, name).ensure_indexes()
+            except Exception as e:
+                logger.error(f"Failed to create {name} indexes: {str(e)}")
+
+    def close(self) -> None:
+        pass
+
+
+# Primary key, secondary lookup fields and the subset of those that must be
+# unique for each collection. The Mongo backend creates these as indexes, the
+# memory backend keeps hash maps. Both raise DuplicateKeyError on a clash.
+COLLECTIONS = {
+    "users": ("user_id", ("email",), ("email",)),
+    "artists": ("artist_id", (), ()),
+    "services": ("service_id", (), ()),
+    "bookings": ("booking_id", ("user_id", "artist_id", "service_id"), ()),
+}
+
+# ============ MONGO ============
+
+def _projection(fields: Optional[Sequence[str]]) -> dict:
+    projection = {"_id": 0}
+    if fields:
+        projection.update({field: 1 for field in fields})
+    return projection
+
+
+class MongoRepository(Repository):
+    def __init__(self, collection, key: str, indexes: Sequence[str] = (), unique: Sequence[str] = ()):
+        super().__init__(key, indexes, unique)
+        self.collection = collection
+
+    async def find_one(self, filter, fields=None):
+        return await self.collection.find_one(filter, _projection(fields))
+
+    async def find(self, filter=None, fields=None, limit=None):
+        return await self.collection.find(filter or {}, _projection(fields)).to_list(limit)
+
+    async def insert(self, doc):
+        from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+        try:
+            # insert_one adds "_id" to the dict it is given
+            await self.collection.insert_one(dict(doc))
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e)) from e
+
+    async def update_many(self, filter, values):
+        from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+        try:
+            result = await self.collection.update_many(filter, {"$set": values})
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e)) from e
+        return result.modified_count
+
+    async def bulk_update(self, updates):
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        if not updates:
+            return 0
+        try:
+            result = await self.collection.bulk_write(
+                [UpdateOne(filter, {"$set": values}) for filter, values in updates], ordered=False
+            )
+        except BulkWriteError as e:
+            if any(error.get("code") == 11000 for error in e.details.get("writeErrors", [])):
+                raise DuplicateKeyError(str(e)) from e
+            raise
+        return result.modified_count
+
+    async def count(self, filter=None):
+        return await self.collection.count_documents(filter or {})
+
+    async def delete_many(self, filter=None):
+        result = await self.collection.delete_many(filter or {})
+        return result.deleted_count
+
+    async def ensure_indexes(self):
+        # Lookup indexes first, so a unique index that cannot be built over
+        # existing duplicates does not stop them being created
+        await self.collection.create_index(self.key, unique=True)
+        for field in self.indexes:
+            if field not in self.unique:
+                await self.collection.create_index(field)
+        for field in self.unique:
+            await self.collection.create_index(field, unique=True)
+
+
+class MongoStorage(Storage):
+    def __init__(self, mongo_url: str, db_name: str):
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        self.client = AsyncIOMotorClient(mongo_url)
+        db = self.client[db_name]
+        super().__init__(**{
+            name: MongoRepository(db[name], key, indexes, unique)
+            for name, (key, indexes, unique) in COLLECTIONS.items()
+        })
+
+    def close(self):
+        self.client.close()
+
+# ============ IN-MEMORY ============
+
+FIELD_OPERATORS = {"$in", "$exists"}
+
+
+def _check_filter(filter: dict) -> None:
+    for field, condition in filter.items():
+        if field == "$or":
+            for sub in condition:
+                _check_filter(sub)
+        elif field.startswith("$"):
+            raise ValueError(f"Unsupported query operator: {field}")
+        elif isinstance(condition, dict):
+            unsupported = set(condition) - FIELD_OPERATORS
+            if unsupported:
+                raise ValueError(f"Unsupported query operator: {', '.join(sorted(unsupported))}")
+
+
+def _matches(doc: dict, filter: dict) -> bool:
+    for field, condition in filter.items():
+        if field == "$or":
+            if not any(_matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if isinstance(condition, dict):
+            if "$in" in condition and doc.get(field) not in condition["$in"]:
+                return False
+            if "$exists" in condition and (field in doc) != condition["$exists"]:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def _select(doc: dict, fields: Optional[Sequence[str]]) -> dict:
+    if not fields:
+        return dict(doc)
+    return {field: doc[field] for field in fields if field in doc}
+
+
+class MemoryRepository(Repository):
+    def __init__(self, key: str, indexes: Sequence[str] = (), unique: Sequence[str] = ()):
+        super().__init__(key, indexes, unique)
+        self._docs: Dict[str, dict] = {}
+        self._order: Dict[str, int] = {}
+        self._sequence = counter()
+        self._index: Dict[str, Dict[object, Set[str]]] = {field: {} for field in self.indexes}
+
+    def _index_add(self, doc: dict) -> None:
+        for field, entries in self._index.items():
+            if field in doc:
+                entries.setdefault(doc[field], set()).add(doc[self.key])
+
+    def _index_remove(self, doc: dict) -> None:
+        for field, entries in self._index.items():
+            ids = entries.get(doc.get(field))
+            if ids:
+                ids.discard(doc[self.key])
+                if not ids:
+                    del entries[doc[field]]
+
+    def _check_unique(self, key_value: str, values: dict) -> None:
+        for field in self.unique:
+            if field not in values:
+                continue
+            holders = self._index[field].get(values[field], ())
+            if any(holder != key_value for holder in holders):
+                raise DuplicateKeyError(f"{field} {values[field]!r} already exists")
+
+    def _candidates(self, filter: dict) -> List[dict]:
+        # Narrow the scan with the primary key or a secondary index when the
+        # filter has an equality (or $in) on one of them.
+        for field in (self.key,) + self.indexes:
+            condition = filter.get(field)
+            if condition is None:
+                continue
+            if isinstance(condition, dict):
+                if "$in" not in condition:
+                    continue
+                values = condition["$in"]
+            else:
+                values = [condition]
+            if field == self.key:
+                ids = {v for v in values if v in self._docs}
+            else:
+                ids = set()
+                for value in values:
+                    ids.update(self._index[field].get(value, ()))
+            # Keep insertion order, which is what an unsorted Mongo find returns
+            return [self._docs[i] for i in sorted(ids, key=self._order.__getitem__)]
+        return list(self._docs.values())
+
+    def _matching(self, filter: Optional[dict]) -> List[dict]:
+        filter = filter or {}
+        _check_filter(filter)
+        return [doc for doc in self._candidates(filter) if _matches(doc, filter)]
+
+    async def find_one(self, filter, fields=None):
+        _check_filter(filter)
+        for doc in self._candidates(filter):
+            if _matches(doc, filter):
+                return _select(doc, fields)
+        return None
+
+    async def find(self, filter=None, fields=None, limit=None):
+        docs = self._matching(filter)
+        if limit is not None:
+            docs = docs[:limit]
+        return [_select(doc, fields) for doc in docs]
+
+    async def insert(self, doc):
+        doc = dict(doc)
+        doc.pop("_id", None)
+        if doc[self.key] in self._docs:
+            raise DuplicateKeyError(f"{self.key} {doc[self.key]!r} already exists")
+        self._check_unique(doc[self.key], doc)
+        self._docs[doc[self.key]] = doc
+        self._order[doc[self.key]] = next(self._sequence)
+        self._index_add(doc)
+
+    async def update_many(self, filter, values):
+        modified = 0
+        for doc in self._matching(filter):
+            if all(field in doc and doc[field] == value for field, value in values.items()):
+                continue
+            self._check_unique(doc[self.key], values)
+            self._index_remove(doc)
+            doc.update(values)
+            self._index_add(doc)
+            modified += 1
+        return modified
+
+    async def bulk_update(self, updates):
+        modified = 0
+        for filter, values in updates:
+            modified += await self.update_many(filter, values)
+        return modified
+
+    async def count(self, filter=None):
+        return len(self._matching(filter))
+
+    async def delete_many(self, filter=None):
+        docs = self._matching(filter)
+        for doc in docs:
+            self._index_remove(doc)
+            del self._docs[doc[self.key]]
+            del self._order[doc[self.key]]
+        return len(docs)
+
+
+class MemoryStorage(Storage):
+    def __init__(self):
+        super().__init__(**{
+            name: MemoryRepository(key, indexes, unique)
+            for name, (key, indexes, unique) in COLLECTIONS.items()
+        })
+
+# ============ CONFIGURATION ============
+
+def create_storage(backend: Optional[str] = None) -> Storage:
+    backend = (backend or os.environ.get('STORAGE_BACKEND', 'mongo')).lower()
+    if backend == "mongo":
+        return MongoStorage(os.environ['MONGO_URL'], os.environ['DB_NAME'])
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
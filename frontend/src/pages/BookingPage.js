@@ -38,8 +38,12 @@ const BookingPage = ({ user }) => {
     const fetchData = async () => {
       try {
         const [servicesRes, artistsRes] = await Promise.all([
-          apiClient.get('/services'),
-          apiClient.get('/artists')
+          apiClient.get('/services', {
+            params: { fields: 'service_id,name,description,duration_minutes,price_start' }
+          }),
+          apiClient.get('/artists', {
+            params: { fields: 'artist_id,name,bio,specialty,image_url' }
+          })
         ]);
         const loadedServices = Array.isArray(servicesRes.data) ? servicesRes.data : [];
         const loadedArtists = Array.isArray(artistsRes.data) ? artistsRes.data : [];
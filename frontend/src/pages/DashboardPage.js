@@ -15,9 +15,69 @@ const DashboardPage = ({ user, setAuth }) => {
     fetchBookings();
   }, []);
 
+  useEffect(() => {
+    if (!localStorage.getItem('token') || typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let retryTimer = null;
+    let stopped = false;
+    let hasConnected = false;
+
+    const upsertBooking = (event) => {
+      const booking = JSON.parse(event.data);
+      setBookings((current) => {
+        const exists = current.some((b) => b.booking_id === booking.booking_id);
+        return exists
+          ? current.map((b) => (b.booking_id === booking.booking_id ? booking : b))
+          : [...current, booking];
+      });
+    };
+
+    const connect = async () => {
+      try {
+        // Stream tokens are short-lived because they travel in the URL
+        const response = await apiClient.post('/bookings/stream/token');
+        if (stopped) return;
+        source = new EventSource(
+          `${apiClient.defaults.baseURL}/bookings/stream?token=${encodeURIComponent(response.data.token)}`
+        );
+      } catch (error) {
+        if (!stopped) retryTimer = setTimeout(connect, 10000);
+        return;
+      }
+
+      source.onopen = () => {
+        // Events sent while disconnected are not replayed, so re-sync
+        if (hasConnected) fetchBookings();
+        hasConnected = true;
+      };
+      source.onerror = () => {
+        // The browser retries on its own until the token expires; after
+        // that the stream is refused and we start over with a new token.
+        if (source.readyState === EventSource.CLOSED && !stopped) {
+          retryTimer = setTimeout(connect, 3000);
+        }
+      };
+      source.addEventListener('booking_created', upsertBooking);
+      source.addEventListener('booking_status_changed', upsertBooking);
+    };
+
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+    };
+  }, []);
+
   const fetchBookings = async () => {
     try {
-      const response = await apiClient.get('/bookings/my');
+      const response = await apiClient.get('/bookings/my', {
+        params: {
+          fields: 'booking_id,artist_name,service_name,appointment_date,appointment_time,notes,status'
+        }
+      });
       setBookings(response.data);
     } catch (error) {
       toast.error('Failed to load bookings');
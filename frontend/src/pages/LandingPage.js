@@ -43,7 +43,9 @@ const LandingPage = ({ setAuth, setUser }) => {
       try {
         await apiClient.post('/seed');
         const [artistsRes, servicesRes] = await Promise.all([
-          apiClient.get('/artists'),
+          apiClient.get('/artists', {
+            params: { fields: 'artist_id,name,bio,specialty,image_url,instagram' }
+          }),
           apiClient.get('/services')
         ]);
         const loadedArtists = Array.isArray(artistsRes.data) ? artistsRes.data : [];
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# The suite runs on the in-memory backend unless STORAGE_BACKEND says
+# otherwise. Against Mongo it uses TEST_DB_NAME so it never wipes DB_NAME.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+if os.environ["STORAGE_BACKEND"] == "mongo":
+    os.environ["DB_NAME"] = os.environ.get("TEST_DB_NAME", "neaxtattoos_test")
+
+from storage import create_storage  # noqa: E402
+import server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+async def _clear(store):
+    for repo in (store.users, store.artists, store.services, store.bookings):
+        await repo.delete_many()
+
+
+@pytest.fixture
+def storage(run, monkeypatch):
+    store = create_storage()
+    run(_clear(store))
+    run(store.ensure_indexes())
+    monkeypatch.setattr(server, "storage", store)
+    yield store
+    run(_clear(store))
+    store.close()
+
+
+@pytest.fixture
+def artist(run, storage):
+    return run(server.create_artist(server.Artist(
+        name="Marcus Chen", bio="Blackwork", specialty="Blackwork",
+        image_url="https://example.com/marcus.jpg", years_experience=12
+    )))
+
+
+@pytest.fixture
+def service(run, storage):
+    return run(server.create_service(server.Service(
+        name="Custom Tattoo", description="Custom work", duration_minutes=180, price_start=200, icon="Palette"
+    )))
+
+
+@pytest.fixture
+def make_user(run, storage):
+    def make(name="Ann", email="ann@example.com"):
+        registered = run(server.register(server.UserRegister(email=email, password="pw", name=name)))
+        return registered["user"]
+    return make
+
+
+@pytest.fixture
+def make_booking(run, artist, service):
+    def make(user, **extra):
+        return run(server.create_booking(server.BookingCreate(
+            artist_id=artist.artist_id, service_id=service.service_id,
+            appointment_date="2026-11-02", appointment_time="14:00", **extra
+        ), user))
+    return make
+
+
+@pytest.fixture
+def make_staff(run, storage, make_user):
+    # Mirrors grant_staff.py, the only way to become staff
+    def make(name="Staff", email="staff@example.com"):
+        user = make_user(name=name, email=email)
+        run(storage.users.update_many({"user_id": user.user_id}, {"role": "staff"}))
+        return user.model_copy(update={"role": "staff"})
+    return make
+
+
+@pytest.fixture
+def api(run, storage):
+    # Drives the real app, routing and dependencies included, over ASGI
+    def request(method, path, body=None, token=None):
+        path, _, query = path.partition("?")
+        headers = [(b"content-type", b"application/json")]
+        if token:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scope = {
+            "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+            "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": headers, "server": ("testserver", 80), "client": ("testclient", 50000),
+        }
+        incoming = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        run(server.app(scope, receive, send))
+        payload = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+        return sent[0]["status"], json.loads(payload) if payload else None
+    return request
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+import server
+from events import BookingEventHub, format_event
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = BookingEventHub(buffer_size=2)
+    monkeypatch.setattr(server, "booking_events", hub)
+    return hub
+
+
+def test_publish_reaches_only_that_users_subscribers(run):
+    async def scenario():
+        hub = BookingEventHub()
+        ann, ann_tab, bob = hub.subscribe("ann"), hub.subscribe("ann"), hub.subscribe("bob")
+        hub.publish("ann", "booking_created", {"booking_id": "b1"})
+        hub.publish("nobody", "booking_created", {"booking_id": "b2"})
+        return ann, ann_tab, bob, hub
+
+    ann, ann_tab, bob, hub = run(scenario())
+    frame = format_event("booking_created", {"booking_id": "b1"})
+    assert ann.queue.get_nowait() == frame
+    assert ann_tab.queue.get_nowait() == frame
+    assert bob.queue.empty()
+    assert hub.subscriber_count == 3
+
+    hub.unsubscribe(ann)
+    hub.unsubscribe(ann_tab)
+    hub.unsubscribe(ann)
+    assert hub.subscriber_count == 1
+
+
+def test_full_subscriber_is_dropped_with_close_sentinel(run):
+    async def scenario():
+        hub = BookingEventHub(buffer_size=2)
+        slow, fast = hub.subscribe("ann"), hub.subscribe("ann")
+        hub.publish("ann", "e", {"n": 1})
+        hub.publish("ann", "e", {"n": 2})
+        fast.queue.get_nowait()
+        fast.queue.get_nowait()
+        hub.publish("ann", "e", {"n": 3})
+        return hub, slow, fast
+
+    hub, slow, fast = run(scenario())
+    assert slow.queue.get_nowait() is None
+    assert slow.queue.empty()
+    assert fast.queue.get_nowait() == format_event("e", {"n": 3})
+    assert hub.subscriber_count == 1
+
+
+def test_format_event():
+    assert format_event("booking_created", {"a": 1}) == 'event: booking_created\ndata: {"a":1}\n\n'
+    assert format_event(None, {"a": 1}) == 'data: {"a":1}\n\n'
+
+
+def test_stream_delivers_events_and_unsubscribes_on_close(run, hub, make_user):
+    user = make_user()
+
+    async def scenario():
+        response = await server.stream_bookings(user)
+        body = response.body_iterator
+        assert (await body.__anext__()).startswith("retry:")
+        # The generator has subscribed by the time it yields its first frame
+        assert hub.subscriber_count == 1
+        hub.publish(user.user_id, "booking_created", {"booking_id": "b1"})
+        frame = await body.__anext__()
+        await body.aclose()
+        return frame
+
+    frame = run(scenario())
+    assert json.loads(frame.split("data: ")[1]) == {"booking_id": "b1"}
+    assert hub.subscriber_count == 0
+
+
+def test_status_change_is_owner_cancel_or_staff_and_publishes(run, hub, make_user, make_staff, make_booking):
+    owner, other = make_user(), make_user(name="Bob", email="bob@example.com")
+    staff = make_staff()
+    booking = make_booking(owner)
+    subscriber = hub.subscribe(owner.user_id)
+
+    with pytest.raises(HTTPException) as exc:
+        run(server.update_booking_status(booking.booking_id, server.BookingStatusUpdate(status="cancelled"), other))
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        run(server.update_booking_status(booking.booking_id, server.BookingStatusUpdate(status="confirmed"), owner))
+    assert exc.value.status_code == 403
+    assert subscriber.queue.empty()
+
+    confirmed = run(server.update_booking_status(booking.booking_id, server.BookingStatusUpdate(status="confirmed"), staff))
+    assert confirmed.status == "confirmed"
+    assert '"status":"confirmed"' in subscriber.queue.get_nowait()
+
+    cancelled = run(server.update_booking_status(booking.booking_id, server.BookingStatusUpdate(status="cancelled"), owner))
+    assert cancelled.status == "cancelled"
+
+
+def test_status_route_needs_login_and_staff_role(api, hub, make_user, make_staff, make_booking):
+    make_staff(email="owner@neax.com")
+    booking = make_booking(make_user())
+    path = f"/api/bookings/{booking.booking_id}/status"
+
+    assert api("PATCH", path, {"status": "cancelled"})[0] == 403
+
+    status, _ = api("POST", "/api/auth/register", {"email": "Owner@neax.com", "password": "pw", "name": "Mallory"})
+    assert status == 400
+    _, body = api("POST", "/api/auth/register", {"email": "mallory@neax.com", "password": "pw", "name": "Mallory"})
+    assert api("PATCH", path, {"status": "confirmed"}, token=body["token"])[0] == 404
+
+    _, body = api("POST", "/api/auth/login", {"email": "Owner@neax.com", "password": "pw"})
+    status, body = api("PATCH", path, {"status": "completed"}, token=body["token"])
+    assert status == 200 and body["status"] == "completed"
+
+
+def test_status_must_be_a_known_value():
+    with pytest.raises(ValidationError):
+        server.BookingStatusUpdate(status="bogus")
+
+
+def test_stream_token_only_works_for_the_stream(run, make_user):
+    user = make_user()
+    token = run(server.create_booking_stream_token(user))["token"]
+
+    assert run(server.get_stream_user(token=token, credentials=None)).user_id == user.user_id
+    with pytest.raises(HTTPException):
+        run(server.get_user_from_token(token))
+
+    login_token = server.create_token(user.user_id, user.email)
+    with pytest.raises(HTTPException):
+        run(server.get_stream_user(token=login_token, credentials=None))
@@ -0,0 +1,79 @@
+import pytest
+
+import server
+
+
+@pytest.fixture
+def staff(make_staff):
+    return make_staff()
+
+
+def test_create_booking_snapshots_display_fields(run, make_user, make_booking):
+    user = make_user()
+    booking = make_booking(user)
+    assert (booking.user_name, booking.user_email) == ("Ann", "ann@example.com")
+    assert (booking.artist_name, booking.service_name) == ("Marcus Chen", "Custom Tattoo")
+
+    [listed] = run(server.get_my_bookings(None, user))
+    assert listed.artist_name == "Marcus Chen"
+
+
+def test_renames_reach_existing_bookings(run, staff, artist, service, make_user, make_booking):
+    user = make_user()
+    make_booking(user)
+
+    run(server.update_artist(artist.artist_id, server.ArtistUpdate(name="Marcus C."), staff))
+    run(server.update_service(service.service_id, server.ServiceUpdate(name="Custom Piece"), staff))
+    run(server.update_me(server.UserUpdate(name="Annie"), user))
+
+    [listed] = run(server.get_all_bookings(None))
+    assert (listed.user_name, listed.artist_name, listed.service_name) == ("Annie", "Marcus C.", "Custom Piece")
+
+
+def test_catalog_routes_are_staff_only_by_role_not_email(api, artist, service, make_staff):
+    make_staff(email="owner@neax.com")
+
+    status, _ = api("POST", "/api/auth/register", {"email": "Owner@neax.com", "password": "pw", "name": "Mallory"})
+    assert status == 400
+
+    status, body = api("POST", "/api/auth/register", {"email": "mallory@neax.com", "password": "pw", "name": "Mallory"})
+    assert status == 200 and body["user"]["role"] == "customer"
+    mallory = body["token"]
+    for path, update in ((f"/api/artists/{artist.artist_id}", {"name": "Pwned"}),
+                         (f"/api/services/{service.service_id}", {"name": "Pwned"})):
+        assert api("PATCH", path, update, token=mallory)[0] == 403
+
+    # Case variants log in to the one lowercased account, which holds the role
+    status, body = api("POST", "/api/auth/login", {"email": "OWNER@neax.com", "password": "pw"})
+    assert status == 200 and body["user"]["email"] == "owner@neax.com"
+    status, body = api("PATCH", f"/api/artists/{artist.artist_id}", {"name": "Marcus C."}, token=body["token"])
+    assert status == 200 and body["name"] == "Marcus C."
+
+
+def test_rename_between_read_and_insert_is_repaired(run, storage, staff, artist, make_user, make_booking, monkeypatch):
+    user = make_user()
+    insert = storage.bookings.insert
+
+    async def rename_then_insert(doc):
+        # The rename and its refresh finish before this booking exists
+        await server.update_artist(artist.artist_id, server.ArtistUpdate(name="Marcus C."), staff)
+        await insert(doc)
+    monkeypatch.setattr(storage.bookings, "insert", rename_then_insert)
+
+    booking = make_booking(user)
+    assert booking.artist_name == "Marcus C."
+    assert run(storage.bookings.get(booking.booking_id))["artist_name"] == "Marcus C."
+
+
+def test_backfill_fills_only_missing_snapshots(run, storage, artist, make_user):
+    user = make_user()
+    run(storage.bookings.insert({
+        "booking_id": "legacy", "user_id": user.user_id, "artist_id": artist.artist_id,
+        "service_id": "deleted-service", "appointment_date": "2026-11-02", "appointment_time": "14:00",
+        "status": "pending", "created_at": "2026-10-01T10:00:00+00:00",
+    }))
+
+    assert run(server.backfill_booking_snapshots()) == 1
+    legacy = run(storage.bookings.get("legacy"))
+    assert (legacy["user_name"], legacy["artist_name"], legacy["service_name"]) == ("Ann", "Marcus Chen", "Unknown")
+    assert run(server.backfill_booking_snapshots()) == 0
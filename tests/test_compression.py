@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+
+import compression
+from compression import CompressionMiddleware, choose_encoding, parse_accept_encoding
+
+LARGE_JSON = b'{"items": [' + b", ".join(b'"artist"' for _ in range(400)) + b"]}"
+
+
+def test_parse_accept_encoding_reads_q_values():
+    assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == [("gzip", 1.0), ("br", 0.5), ("*", 0.0)]
+    assert parse_accept_encoding("gzip;q=oops") == [("gzip", 0.0)]
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("gzip, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def make_app(messages):
+    async def app(scope, receive, send):
+        for message in messages:
+            await send(message)
+    return app
+
+
+def response(body, content_type=b"application/json", more_body=False):
+    start = {"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", content_type), (b"content-length", str(len(body)).encode()),
+    ]}
+    return [start, {"type": "http.response.body", "body": body, "more_body": more_body}]
+
+
+def call(run, messages, accept_encoding="gzip", **options):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    run(CompressionMiddleware(make_app(messages), **options)(scope, None, send))
+    return sent
+
+
+def test_large_json_is_compressed(run):
+    start, body = call(run, response(LARGE_JSON))
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(body["body"]) < len(LARGE_JSON)
+    assert gzip.decompress(body["body"]) == LARGE_JSON
+
+
+def test_small_body_passes_through(run):
+    messages = response(b'{"ok": true}')
+    assert call(run, messages) == messages
+
+
+def test_non_json_and_identity_pass_through(run):
+    messages = response(LARGE_JSON, content_type=b"text/html")
+    assert call(run, messages) == messages
+    messages = response(LARGE_JSON)
+    assert call(run, messages, accept_encoding="identity") == messages
+
+
+def test_streaming_response_passes_through(run):
+    # Decided by more_body alone, even for a JSON content type
+    start, first = response(LARGE_JSON, more_body=True)
+    last = {"type": "http.response.body", "body": LARGE_JSON, "more_body": False}
+    assert call(run, [start, first, last]) == [start, first, last]
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+def test_parse_fields_dedupes_and_rejects_unknown():
+    assert server.parse_fields(None, server.Artist) is None
+    assert server.parse_fields(" , ", server.Artist) is None
+    assert server.parse_fields("name, specialty,name", server.Artist) == ["name", "specialty"]
+    with pytest.raises(HTTPException) as exc:
+        server.parse_fields("name,password_hash", server.Artist)
+    assert exc.value.status_code == 400
+    assert "password_hash" in exc.value.detail
+
+
+def test_trimmed_model_keeps_only_selected_fields_and_is_cached():
+    trimmed = server.trimmed_model(server.Artist, ("name", "instagram"))
+    assert list(trimmed.model_fields) == ["name", "instagram"]
+    assert trimmed(name="Ann").model_dump() == {"name": "Ann", "instagram": None}
+    assert server.trimmed_model(server.Artist, ("name", "instagram")) is trimmed
+
+
+def test_artists_fields_projection(run, artist):
+    assert body(run(server.get_artists("name,specialty"))) == [{"name": "Marcus Chen", "specialty": "Blackwork"}]
+
+
+def test_booking_fields_projection(run, make_user, make_booking):
+    user = make_user()
+    make_booking(user, notes="Left forearm")
+    assert body(run(server.get_my_bookings("artist_name,notes", user))) == [
+        {"artist_name": "Marcus Chen", "notes": "Left forearm"}
+    ]
+
+
+def test_sparse_bookings_fall_back_for_missing_snapshots(run, storage, make_user):
+    user = make_user()
+    run(storage.bookings.insert({
+        "booking_id": "legacy", "user_id": user.user_id, "artist_id": "a", "service_id": "s",
+        "appointment_date": "2026-11-02", "appointment_time": "14:00",
+        "status": "pending", "created_at": "2026-10-01T10:00:00+00:00",
+    }))
+
+    assert body(run(server.get_all_bookings("user_name,status"))) == [{"user_name": "Unknown", "status": "pending"}]
+    assert run(server.get_all_bookings(None))[0].artist_name == "Unknown"
@@ -0,0 +1,137 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+from storage import DuplicateKeyError, MemoryRepository, Storage, _matches
+
+
+def booking(booking_id, user_id, **extra):
+    return {"booking_id": booking_id, "user_id": user_id, "artist_id": "a1", "service_id": "s1", **extra}
+
+
+@pytest.fixture
+def bookings(run, storage):
+    repo = storage.bookings
+    run(repo.insert(booking("b1", "u1", status="pending", artist_name="Ann")))
+    run(repo.insert(booking("b2", "u2", status="confirmed")))
+    run(repo.insert(booking("b3", "u1", status="cancelled", artist_name="Ann")))
+    return repo
+
+
+def test_matches_equality_in_exists_and_or():
+    doc = {"user_id": "u1", "status": "pending"}
+    assert _matches(doc, {"user_id": "u1"})
+    assert not _matches(doc, {"user_id": "u2"})
+    assert _matches(doc, {"status": {"$in": ["pending", "confirmed"]}})
+    assert not _matches(doc, {"status": {"$in": ["cancelled"]}})
+    assert _matches(doc, {"notes": {"$exists": False}})
+    assert not _matches(doc, {"status": {"$exists": False}})
+    assert _matches(doc, {"$or": [{"user_id": "u2"}, {"status": "pending"}]})
+    assert not _matches(doc, {"$or": [{"user_id": "u2"}, {"status": "cancelled"}]})
+
+
+def test_candidates_use_key_and_indexes_before_full_scan(run):
+    repo = MemoryRepository("booking_id", ("user_id",))
+    for doc in (booking("b1", "u1"), booking("b2", "u2"), booking("b3", "u1")):
+        run(repo.insert(doc))
+
+    assert [d["booking_id"] for d in repo._candidates({"booking_id": "b2"})] == ["b2"]
+    assert [d["booking_id"] for d in repo._candidates({"user_id": "u1"})] == ["b1", "b3"]
+    assert [d["booking_id"] for d in repo._candidates({"user_id": {"$in": ["u2", "u1"]}})] == ["b1", "b2", "b3"]
+    # $exists cannot use an index, and artist_id is not indexed here
+    assert len(repo._candidates({"user_id": {"$exists": True}})) == 3
+    assert len(repo._candidates({"artist_id": "a1"})) == 3
+
+
+def test_key_in_returns_insertion_order_without_duplicates(run):
+    repo = MemoryRepository("k")
+    run(repo.insert({"k": "1"}))
+    run(repo.insert({"k": "2"}))
+    assert run(repo.find({"k": {"$in": ["2", "1", "1", "3"]}})) == [{"k": "1"}, {"k": "2"}]
+
+
+@pytest.mark.parametrize("filter", [
+    {"k": {"$ne": "1"}},
+    {"k": {"$in": ["1"], "$gt": "0"}},
+    {"$and": [{"k": "1"}]},
+    {"$or": [{"k": {"$regex": "1"}}]},
+])
+def test_unsupported_operators_raise(run, filter):
+    repo = MemoryRepository("k")
+    run(repo.insert({"k": "1"}))
+    with pytest.raises(ValueError):
+        run(repo.find(filter))
+    with pytest.raises(ValueError):
+        run(repo.find_one(filter))
+    with pytest.raises(ValueError):
+        run(repo.count(filter))
+
+
+def test_one_collection_failing_to_index_does_not_skip_the_rest(run):
+    class Failing(MemoryRepository):
+        async def ensure_indexes(self):
+            raise RuntimeError("duplicate emails")
+
+    class Recording(MemoryRepository):
+        indexed = False
+
+        async def ensure_indexes(self):
+            self.indexed = True
+
+    others = [Recording("id") for _ in range(3)]
+    run(Storage(Failing("id"), *others).ensure_indexes())
+    assert all(repo.indexed for repo in others)
+
+
+def test_find_filters_projects_and_keeps_insertion_order(run, bookings):
+    found = run(bookings.find({"user_id": "u1"}, ["booking_id", "status"]))
+    assert found == [{"booking_id": "b1", "status": "pending"}, {"booking_id": "b3", "status": "cancelled"}]
+
+    found = run(bookings.find({"status": {"$in": ["confirmed", "cancelled"]}}, ["booking_id"]))
+    assert [d["booking_id"] for d in found] == ["b2", "b3"]
+
+    missing = {"$or": [{"artist_name": {"$exists": False}}, {"status": "cancelled"}]}
+    assert [d["booking_id"] for d in run(bookings.find(missing, ["booking_id"]))] == ["b2", "b3"]
+
+    assert run(bookings.find(limit=2, fields=["booking_id"])) == [{"booking_id": "b1"}, {"booking_id": "b2"}]
+    assert run(bookings.get("b2"))["status"] == "confirmed"
+    assert run(bookings.get("missing")) is None
+
+
+def test_update_many_reindexes_changed_fields(run, bookings):
+    assert run(bookings.update_many({"booking_id": "b2"}, {"user_id": "u1"})) == 1
+    assert [d["booking_id"] for d in run(bookings.find({"user_id": "u1"}))] == ["b1", "b2", "b3"]
+    assert run(bookings.find({"user_id": "u2"})) == []
+
+    # Setting a value a document already has is not a modification
+    assert run(bookings.update_many({"user_id": "u1"}, {"artist_name": "Ann"})) == 1
+
+
+def test_delete_many_removes_from_indexes(run, bookings):
+    assert run(bookings.delete_many({"user_id": "u1"})) == 2
+    assert run(bookings.find({"user_id": "u1"})) == []
+    assert run(bookings.count()) == 1
+    assert run(bookings.delete_many()) == 1
+    assert run(bookings.count()) == 0
+
+
+def test_duplicate_keys_are_rejected(run, storage):
+    run(storage.users.insert({"user_id": "u1", "email": "a@b.co", "name": "Ann"}))
+    with pytest.raises(DuplicateKeyError):
+        run(storage.users.insert({"user_id": "u1", "email": "c@d.co", "name": "Cy"}))
+    with pytest.raises(DuplicateKeyError):
+        run(storage.users.insert({"user_id": "u2", "email": "a@b.co", "name": "Ann"}))
+
+
+def test_register_turns_duplicate_email_race_into_400(run, storage, monkeypatch):
+    run(server.register(server.UserRegister(email="a@b.co", password="pw", name="Ann")))
+
+    # Simulate a concurrent register that passed the existence check
+    async def not_found(*args, **kwargs):
+        return None
+    monkeypatch.setattr(storage.users, "find_one", not_found)
+
+    with pytest.raises(HTTPException) as exc:
+        run(server.register(server.UserRegister(email="a@b.co", password="pw", name="Ann")))
+    assert exc.value.status_code == 400
+    assert run(storage.users.count()) == 1